@@ -5,29 +5,122 @@
 
 
 import itertools
+import pathlib
+import pickle
 import streamlit as st
 
+WORDS_PATH = pathlib.Path(__file__).with_name("sowpods.txt")
+INDEX_PATH = WORDS_PATH.with_suffix(".pkl")
+# Bump whenever the layout of the pickled index changes so stale files are rebuilt.
+INDEX_VERSION = 3
+# Past this many results the list is shown as a table, which the browser renders lazily.
+MAX_MARKDOWN_RESULTS = 500
+# The search visits every combination of the input letters, so it grows as 2**len(letters).
+MAX_LETTERS = 20
+
 def load_words(file_path):
     with open(file_path, 'r') as f:
         words = [word.lower() for word in f.read().splitlines()]
     return words
 
-sowpods_words = set(load_words("C:\\Users\\mjman\\Downloads\\sowpods.txt"))
+def letter_mask(letters):
+    """Returns a bitmask with bit i set when the i-th letter of the alphabet occurs in letters."""
+    mask = 0
+    for letter in letters:
+        mask |= 1 << (ord(letter) - ord('a'))
+    return mask
+
+def build_anagram_index(words):
+    """Maps each sorted-letter signature to its letter mask and the space-separated words spelled with exactly those letters."""
+    anagrams = {}
+    for word in words:
+        anagrams.setdefault("".join(sorted(word)), []).append(word)
+    # A single joined string per signature keeps one object alive instead of a list plus one str
+    # per word, which cuts the resident size of the index by about a third.
+    return {signature: (letter_mask(signature), " ".join(group)) for signature, group in anagrams.items()}
+
+def build_index(file_path):
+    """Builds the anagram index from a word list file."""
+    return build_anagram_index(set(load_words(file_path)))
+
+@st.cache_resource
+def get_index():
+    """Returns the anagram index, loaded once per process and pickled next to the word list."""
+    try:
+        if INDEX_PATH.stat().st_mtime >= WORDS_PATH.stat().st_mtime:
+            with open(INDEX_PATH, 'rb') as f:
+                version, index = pickle.load(f)
+            if version == INDEX_VERSION:
+                return index
+    except (OSError, pickle.UnpicklingError, EOFError, TypeError, ValueError):
+        pass
+    index = build_index(WORDS_PATH)
+    try:
+        with open(INDEX_PATH, 'wb') as f:
+            pickle.dump((INDEX_VERSION, index), f, protocol=5)
+    except OSError:
+        pass
+    return index
 
 def all_words(letters, include_letters="", exclude_letters="", min_length=1, max_length=None):
-    """Returns a list of all the English words possible from a set of letters."""
+    """Returns a list of all the English words possible from a set of letters, longest first."""
+    return [word for _, words in iter_words(letters, include_letters, exclude_letters, min_length, max_length) for word in words]
+
+def iter_words(letters, include_letters="", exclude_letters="", min_length=1, max_length=None):
+    """Yields (length, words) pairs for each word length, from longest to shortest."""
+    # Normalize the arguments so reruns with equivalent inputs share cache entries.
+    sorted_letters = "".join(sorted(letters.lower()))
+    include_letters = "".join(sorted(set(include_letters.lower())))
+    exclude_letters = "".join(sorted(set(exclude_letters.lower())))
+    # Walking lengths downwards yields the results already ordered, without a sort.
+    for length in range(max_length or len(letters), min_length - 1, -1):
+        yield length, find_words(sorted_letters, include_letters, exclude_letters, length)
+
+@st.cache_data(max_entries=1024)
+def find_words(sorted_letters, include_letters, exclude_letters, length):
+    """Returns the words of the given length spelled by sorted_letters."""
+    anagram_index = get_index()
     generated_words = []
-    max_length = max_length or len(letters)
-    for i in range(min_length, max_length + 1):
-        for permutation in itertools.permutations(letters.lower(), i):
-            word = "".join(permutation)
-            if word in sowpods_words and all(letter in word for letter in include_letters) and not any(letter in word for letter in exclude_letters):
-                generated_words.append(word)
-    return sorted(generated_words, key=len, reverse=True)
+    include_mask = letter_mask(include_letters)
+    # A word containing an excluded letter must have drawn it from the input, so dropping those
+    # letters up front removes the exclude test and shrinks the number of combinations.
+    sorted_letters = sorted_letters.translate(str.maketrans("", "", exclude_letters))
+    # Likewise every included letter has to come from what is left of the input, and fit in the length.
+    if length < len(include_letters) or not set(include_letters).issubset(sorted_letters):
+        return generated_words
+    # Every anagram of a combination shares its sorted signature, so one lookup per combination
+    # replaces a membership test per permutation.
+    combinations = itertools.combinations(sorted_letters, length)
+    if len(set(sorted_letters)) < len(sorted_letters):
+        # Repeated letters produce the same combination more than once; keep the first of each.
+        combinations = dict.fromkeys(combinations)
+    for combination in combinations:
+        entry = anagram_index.get("".join(combination))
+        # Anagrams share their letters, so the include test runs once per signature.
+        if entry is not None and entry[0] & include_mask == include_mask:
+            generated_words.extend(entry[1].split())
+    return generated_words
+
+def show_words(generated_words):
+    """Renders the words as a two-column list, or as a table when there are many of them."""
+    if len(generated_words) > MAX_MARKDOWN_RESULTS:
+        st.dataframe({"word": generated_words})
+        return
+    # One markdown element per column instead of one per word.
+    left, right = st.columns(2)
+    left.markdown("\n".join(f"- {word}" for word in generated_words[0::2]))
+    right.markdown("\n".join(f"- {word}" for word in generated_words[1::2]))
+
+def is_english(letters):
+    """Returns True when letters consists only of ASCII letters."""
+    return letters.isascii() and letters.isalpha()
 
 def main():
     st.title("English Word Generator")
 
+    with st.spinner('Loading dictionary...'):
+        get_index()
+
     # Instructions
     st.markdown("""
     This application finds all possible English words from the provided letters.
@@ -36,26 +129,37 @@ def main():
 
     # User input
     letters = st.text_input("Enter the letters you want to generate words from:", "abcdefgh").strip()
+
+    # Validate the letters before anything depends on their length
+    if not letters:
+        st.info('Enter some letters to generate words from.')
+        return
+    if not is_english(letters):
+        st.error('Please enter only English letters.')
+        return
+    if len(letters) > MAX_LETTERS:
+        st.error(f'Please enter at most {MAX_LETTERS} letters.')
+        return
+
     min_length = st.slider('Minimum length of words', 1, len(letters), 1)
     max_length = st.slider('Maximum length of words', min_length, len(letters), len(letters))
     include_letters = st.text_input("Letters to include (optional):").strip()
     exclude_letters = st.text_input("Letters to exclude (optional):").strip()
 
-    # Validate input
-    if not all((x.isalpha() or x == "") for x in [letters, include_letters, exclude_letters]):
+    # Validate the optional filters
+    if not all(is_english(x) for x in (include_letters, exclude_letters) if x):
         st.error('Please enter only English letters.')
-    else:
-        # Generate words
-        with st.spinner('Generating words...'):
-            generated_words = all_words(letters, include_letters, exclude_letters, min_length, max_length)
-
-        # Display results
-        st.write(f"The following {len(generated_words)} English words can be formed from the letters '{letters}':")
-
-        # Use columns to display the words
-        cols = st.columns(2)
-        for i, word in enumerate(generated_words):
-            cols[i % 2].markdown(f"- {word}")
+        return
+
+    # Generate words, redrawing the results as each length completes
+    results = st.empty()
+    generated_words = []
+    with st.spinner('Generating words...'):
+        for _, words in iter_words(letters, include_letters, exclude_letters, min_length, max_length):
+            generated_words.extend(words)
+            with results.container():
+                st.write(f"The following {len(generated_words)} English words can be formed from the letters '{letters}':")
+                show_words(generated_words)
 
 if __name__ == "__main__":
     main()